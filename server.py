@@ -1,39 +1,279 @@
 """
 A multi-threaded HTTP server built from scratch in Python.
-This server handles GET and POST requests, serves static and binary files,
+This server handles GET, HEAD and POST requests, serves static and binary files,
 supports persistent connections (Keep-Alive), and includes basic security features.
 """
 
 # modules for socket programming and command-line arguments.
 import socket
 import argparse
+import sys
+import signal
 
 # modules for file system operations, date formatting, JSON, and unique IDs.
 import os
+import stat
 from datetime import datetime
-from email.utils import formatdate
+from email.utils import formatdate, parsedate_tz, mktime_tz
 import json
+import mmap
+import re
 import time
-import random
+import itertools
 
 # modules for concurrency (threading and a thread-safe queue).
 import threading
 import queue
+import selectors
+from collections import deque
+from collections import OrderedDict
 
 # modules for professional, timestamped logging.
 import logging
+import logging.handlers
 
 
-# Setting up a global logger. All logging calls will use this format.
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues log records without formatting them, so all formatting and writing
+    happens on the listener thread instead of in the worker that logged.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Setting up a global logger. Logging calls only put records on a queue; a single
+# background listener (started in main) formats them and writes them to stderr,
+# so worker threads never contend for the stream lock.
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+# All log lines use this format.
+log_handler.setFormatter(logging.Formatter(fmt='[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+logging.root.addHandler(DeferredQueueHandler(log_queue))
+logging.root.setLevel(logging.INFO)
 
 
 # Defines the base directory for serving files, located in a 'resources' subdirectory.
-RESOURCES_DIR = os.path.join(os.path.dirname(__file__), 'resources')
+# It is made absolute once here, so request paths never need resolving against the CWD.
+RESOURCES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'resources'))
+# Served files must lie below this prefix. The trailing separator keeps a sibling
+# directory such as 'resources_evil' from passing the check.
+RESOURCES_DIR_PREFIX = RESOURCES_DIR.rstrip(os.sep) + os.sep
+
+# Keep-Alive limits, advertised to clients in the `Keep-Alive` response header.
+KEEP_ALIVE_TIMEOUT = 30
+MAX_REQUESTS_PER_CONNECTION = 100
+# Time allowed for a request's complete head to arrive once reading it has started.
+HEAD_READ_TIMEOUT = 30
+
+# Send and receive buffer size requested for each client socket.
+SOCKET_BUFFER_SIZE = 1024 * 1024
+
+# The socket option that holds back partial packets while a response is being written.
+# Python doesn't export TCP_NOPUSH, so its value from <netinet/tcp.h> is used on BSD/macOS.
+if hasattr(socket, 'TCP_CORK'):
+    CORK_OPTION = socket.TCP_CORK
+elif sys.platform == 'darwin' or sys.platform.startswith('freebsd'):
+    CORK_OPTION = getattr(socket, 'TCP_NOPUSH', 4)
+else:
+    CORK_OPTION = None
+
+# Whether the OS can copy a file to a socket in the kernel. Without it (e.g. on Windows),
+# large files are memory-mapped and sent from the mapping instead.
+HAS_SENDFILE = hasattr(os, 'sendfile')
+
+# Pending connections the kernel queues per listening socket before refusing new ones.
+LISTEN_BACKLOG = 1024
+
+# Files up to this size are kept in memory; larger ones are streamed with sendfile (or mmap).
+CACHE_MAX_FILE_SIZE = 256 * 1024
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Upper bound on remembered path resolutions (see `resolved_paths`).
+RESOLVED_PATHS_MAX_ENTRIES = 4096
+
+# Limits on how much of a request is buffered in memory.
+RECV_BUFFER_SIZE = 65536
+MAX_HEADER_SIZE = 8192
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+# Response fragments that never change, encoded once at startup instead of per response.
+STATUS_LINES = {
+    code: f"HTTP/1.1 {code} {message}\r\n".encode('ascii')
+    for code, message in [
+        (200, "OK"), (201, "Created"), (304, "Not Modified"),
+        (400, "Bad Request"), (403, "Forbidden"), (404, "Not Found"), (405, "Method Not Allowed"),
+        (413, "Payload Too Large"), (415, "Unsupported Media Type"), (431, "Request Header Fields Too Large"),
+        (500, "Internal Server Error"), (503, "Service Unavailable"),
+    ]
+}
+SERVER_HEADER = b"Server: MyPythonHTTPServer\r\n"
+KEEP_ALIVE_HEADERS = (f"Connection: keep-alive\r\n"
+                      f"Keep-Alive: timeout={KEEP_ALIVE_TIMEOUT}, max={MAX_REQUESTS_PER_CONNECTION}\r\n").encode('ascii')
+CLOSE_HEADERS = b"Connection: close\r\n"
+JSON_CONTENT_TYPE_HEADER = b"Content-Type: application/json\r\n"
+RETRY_AFTER_HEADER = b"Retry-After: 10\r\n"
+ALLOW_HEADER = b"Allow: GET, HEAD, POST\r\n"
+
+# Maps file extensions to their (Content-Type, is_attachment) pair, with the type pre-encoded.
+# Text and images are sent as a generic binary stream to trigger a download; web assets
+# a page references (styles, scripts, icons, fonts) are served inline with their real type.
+_HTML = (b'text/html; charset=utf-8', False)
+_DOWNLOAD = (b'application/octet-stream', True)
+CONTENT_TYPES = {
+    '.html': _HTML,
+    '.htm': _HTML,
+    '.txt': _DOWNLOAD,
+    '.png': _DOWNLOAD,
+    '.jpg': _DOWNLOAD,
+    '.jpeg': _DOWNLOAD,
+    '.css': (b'text/css; charset=utf-8', False),
+    '.js': (b'text/javascript; charset=utf-8', False),
+    '.mjs': (b'text/javascript; charset=utf-8', False),
+    '.svg': (b'image/svg+xml', False),
+    '.ico': (b'image/x-icon', False),
+    '.gif': (b'image/gif', False),
+    '.webp': (b'image/webp', False),
+    '.woff': (b'font/woff', False),
+    '.woff2': (b'font/woff2', False),
+}
+
+# Precompressed sidecar files (e.g. `style.css.gz` next to `style.css`) that can be sent
+# in place of the original, as (content-coding, file suffix) pairs in order of preference.
+PRECOMPRESSED_ENCODINGS = (
+    ('br', '.br'),
+    ('zstd', '.zst'),
+    ('gzip', '.gz'),
+)
+# Formats that are already compressed, so no sidecars are looked up for them.
+INCOMPRESSIBLE_EXTENSIONS = frozenset(('.png', '.jpg', '.jpeg', '.gif', '.webp', '.woff', '.woff2'))
+VARY_ACCEPT_ENCODING_HEADER = b"Vary: Accept-Encoding\r\n"
+
+# Precompiled pattern for the request line of a request, matched on raw bytes.
+REQUEST_LINE_RE = re.compile(rb'([A-Z]+) ([^ \r\n]+) (HTTP/\d\.\d)\r\n')
+
+
+class Connection:
+    """
+    State of a client connection, kept across requests while it is parked between them.
+    """
+    def __init__(self, client_socket: socket.socket, server_config: tuple):
+        self.socket = client_socket
+        self.server_config = server_config
+        self.requests_handled = 0
+        # Bytes received from the client that haven't been consumed as a request yet.
+        self.buffer = bytearray()
+        self.last_active = time.monotonic()
+
+
+class IdleConnectionMonitor:
+    """
+    Watches idle connections (new ones and keep-alive ones between requests) from a single
+    thread using `selectors`, so a connection waiting for a request costs a file descriptor,
+    not a worker. Connections that become readable are handed to the thread pool.
+    """
+    def __init__(self, thread_pool: 'ThreadPool', idle_timeout: int):
+        self.thread_pool = thread_pool
+        self.idle_timeout = idle_timeout
+        self.selector = selectors.DefaultSelector()
+        # Workers hand connections over through this deque; only the monitor thread
+        # touches the selector, since selectors are not thread-safe.
+        self.pending = deque()
+        # A socket pair used to wake the monitor up when a connection is parked.
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_reader.setblocking(False)
+        self.wakeup_writer.setblocking(False)
+        self.selector.register(self.wakeup_reader, selectors.EVENT_READ)
+        self.thread = threading.Thread(target=self._run, name="IdleMonitor", daemon=True)
+        self.thread.start()
+
+    def park(self, connection: Connection):
+        """
+        Called by a listener for a new connection, or by a worker once it has
+        finished a request on a keep-alive connection.
+        """
+        connection.last_active = time.monotonic()
+        self.pending.append(connection)
+        try:
+            self.wakeup_writer.send(b'\0')
+        except BlockingIOError:
+            pass  # The wakeup buffer is full, so the monitor is already due to wake up.
+
+    def _run(self):
+        """The main loop of the monitor thread."""
+        next_sweep = time.monotonic() + 1
+        while True:
+            for key, _ in self.selector.select(timeout=1):
+                if key.fileobj is self.wakeup_reader:
+                    self._drain_wakeups()
+                    continue
+                # The client sent data (or closed), so a worker can serve it without blocking.
+                self.selector.unregister(key.fileobj)
+                try:
+                    self._dispatch(key.data)
+                except Exception as e:
+                    # One bad connection must never stop the monitor, or no connection
+                    # would be handed to a worker again.
+                    logging.error(f"[IdleMonitor] Failed to dispatch a connection: {e}")
+                    key.data.socket.close()
+
+            while self.pending:
+                connection = self.pending.popleft()
+                try:
+                    self.selector.register(connection.socket, selectors.EVENT_READ, connection)
+                except (ValueError, KeyError, OSError) as e:
+                    # e.g. the socket was already closed, so there is nothing to watch.
+                    logging.error(f"[IdleMonitor] Failed to watch a connection: {e}")
+                    connection.socket.close()
+
+            # Sweeping for timed-out connections at most once per second.
+            now = time.monotonic()
+            if now >= next_sweep:
+                self._close_expired(now)
+                next_sweep = now + 1
+
+    def _drain_wakeups(self):
+        try:
+            while self.wakeup_reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _dispatch(self, connection: Connection):
+        try:
+            self.thread_pool.add_task(connection)
+        except queue.Full:
+            # New connections come through here too, and a readable socket often just means
+            # the client closed or reset it. Those are closed quietly instead of being sent a
+            # 503 (the socket is readable, so peeking at it never blocks).
+            try:
+                peer_closed = not connection.socket.recv(1, socket.MSG_PEEK)
+            except OSError:
+                peer_closed = True
+            if peer_closed:
+                connection.socket.close()
+                return
+            logging.warning(f"[IdleMonitor] Thread pool queue is full. Rejecting connection.")
+            # The 503 is sent without blocking: this thread watches every parked connection,
+            # so a client that has stopped reading must not be able to stall it.
+            head, _ = build_http_response(503, "Service Unavailable", RETRY_AFTER_HEADER, keep_alive=False)
+            try:
+                connection.socket.setblocking(False)
+                connection.socket.send(head)
+            except OSError:
+                pass  # The send buffer is full, or the client already reset the connection.
+            finally:
+                connection.socket.close()
+
+    def _close_expired(self, now: float):
+        for key in list(self.selector.get_map().values()):
+            connection = key.data
+            if connection is None or now - connection.last_active < self.idle_timeout:
+                continue
+            self.selector.unregister(key.fileobj)
+            logging.info(f"[IdleMonitor] Connection timed out.")
+            connection.socket.close()
 
 
 class ThreadPool:
@@ -41,9 +281,14 @@ class ThreadPool:
     Manages a pool of worker threads to handle client connections concurrently.
     """
     def __init__(self, max_threads: int, queue_size: int):
-        # The task queue holds (client_socket, server_config) tuples.
+        # The task queue holds Connection objects that have a request ready to be read.
+        # `SimpleQueue` is implemented in C and takes a single lock per put/get, unlike
+        # `queue.Queue`, which also maintains Conditions for `maxsize` and `task_done`.
+        self.tasks = queue.SimpleQueue()
         # It's bounded to a max size to prevent the server from being overwhelmed (STEP 7).
-        self.tasks = queue.Queue(maxsize=queue_size)
+        self.queue_size = queue_size
+        # Connections wait here for their next request instead of holding a worker.
+        self.idle_connections = IdleConnectionMonitor(self, idle_timeout=KEEP_ALIVE_TIMEOUT)
         self.workers = []
         for i in range(max_threads):
             # Create and start each worker thread.
@@ -55,172 +300,651 @@ class ThreadPool:
     def _worker(self):
         """The main loop for each worker thread."""
         while True:
+            # `self.tasks.get()` is a blocking call. The thread will sleep efficiently
+            # until a task is available in the queue.
+            connection = self.tasks.get()
             try:
-                # `self.tasks.get()` is a blocking call. The thread will sleep efficiently
-                # until a task is available in the queue.
-                client_socket, server_config = self.tasks.get()
-                handle_connection(client_socket, server_config)
-            finally:
-                # Used to signal that the task is done, for queue management.
-                self.tasks.task_done()
+                keep_open = handle_connection(connection)
+            except Exception as e:
+                # One failed connection must never end the worker, or the pool would shrink for good.
+                logging.error(f"[{threading.current_thread().name}] Unhandled error: {e}")
+                connection.socket.close()
+                continue
+            if keep_open:
+                self.idle_connections.park(connection)
 
     def add_task(self, task):
         """
-        Called by the main thread to add a new connection to the queue.
-        `block=False` makes it non-blocking, raising `queue.Full` if the queue is saturated.
+        Called by the idle monitor to queue a connection whose request is ready to be read.
+        It never blocks, raising `queue.Full` if the queue is saturated.
         """
-        self.tasks.put(task, block=False)
+        # qsize() is only approximate with several producers, which is fine for load shedding.
+        if self.tasks.qsize() >= self.queue_size:
+            raise queue.Full
+        self.tasks.put(task)
 
 
-def parse_http_request(raw_request: str) -> dict:
+class FileCache:
     """
-    Parses a raw HTTP request string into a structured dictionary,
-    separating the method, path, version, headers, and body.
+    A thread-safe LRU cache of small static files, keyed by absolute file path.
+    Each entry stores the file's mtime and size, so edits on disk invalidate it,
+    along with its response headers, encoded once when the file is loaded.
     """
-    if not raw_request:
-        return {}
-    
-    # The body is separated from the headers by a double newline (\r\n\r\n).
-    try:
-        head, body = raw_request.split('\r\n\r\n', 1)
-    except ValueError:
-        head, body = raw_request, ""
+    def __init__(self, max_entries: int, max_bytes: int):
+        # OrderedDict keeps entries in recency order: oldest first, newest last.
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.lock = threading.Lock()
 
-    lines = head.split('\r\n')
-    
-    # The first line is the request line (e.g., "GET /index.html HTTP/1.1").
-    try:
-        method, path, version = lines[0].split(' ')
-    except ValueError:
+    def get(self, file_path: str, st: os.stat_result):
+        """Returns the cached (header_block, body) pair, or None on a miss or a stale entry."""
+        with self.lock:
+            entry = self.entries.get(file_path)
+            if entry is None:
+                return None
+            mtime_ns, size, header_block, body = entry
+            if mtime_ns != st.st_mtime_ns or size != st.st_size:
+                # The file changed on disk since it was cached.
+                self._remove(file_path)
+                return None
+            self.entries.move_to_end(file_path)
+            return header_block, body
+
+    def put(self, file_path: str, st: os.stat_result, header_block: bytes, body: bytes):
+        """Stores a file, evicting the least recently used entries if the cache is full."""
+        with self.lock:
+            if file_path in self.entries:
+                self._remove(file_path)
+            self.entries[file_path] = (st.st_mtime_ns, st.st_size, header_block, body)
+            self.total_bytes += len(body)
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+
+    def _remove(self, file_path: str):
+        """Drops an entry. Must be called with the lock held."""
+        body = self.entries.pop(file_path)[3]
+        self.total_bytes -= len(body)
+
+
+file_cache = FileCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+
+# Maps request paths to their resolved (file_path, content_type, is_attachment, mtime_ns, sidecars),
+# where `sidecars` lists the precompressed versions found for the file at that mtime.
+# Only canonical paths of servable files are stored (not e.g. '/x/../index.html' or
+# '//index.html', which clients can vary endlessly), and the entry count is capped too,
+# since a case-insensitive file system accepts many spellings of one canonical path.
+# Single dict operations are atomic in CPython, so no lock is needed.
+resolved_paths = {}
+
+# Per-thread state: each worker's receive buffer.
+_thread_local = threading.local()
+
+# Upload file names combine the process ID and the server's start time (which together
+# identify a server process) with a process-wide counter, e.g. `upload_4242_20251007T070349_17.json`.
+# The timestamp is when the server started, not when the file was uploaded.
+# `next()` on an itertools.count is atomic in CPython, so workers can share it.
+SERVER_START_TIME = time.strftime('%Y%m%dT%H%M%S')
+upload_counter = itertools.count(1)
+
+
+class RequestError(Exception):
+    """
+    Raised while reading a request that has to be rejected with an HTTP error status.
+    """
+    def __init__(self, status_code: int, status_message: str):
+        super().__init__(f"{status_code} {status_message}")
+        self.status_code = status_code
+        self.status_message = status_message
+
+
+def parse_http_request(raw_head: bytes) -> dict:
+    """
+    Parses the head of a raw HTTP request (request line and header lines, each ending
+    in CRLF) into a structured dictionary with the method, path, version, and headers.
+    """
+    # The first line is the request line (e.g., "GET /index.html HTTP/1.1"). Matching it
+    # on the raw bytes rejects garbage before anything is decoded or split.
+    match = REQUEST_LINE_RE.match(raw_head)
+    if not match:
         return {}  # Malformed request line
+    method, path, version = match.groups()
+    try:
+        path = path.decode('utf-8')
+    except UnicodeDecodeError:
+        return {}
 
-    # Subsequent lines are headers (e.g., "Host: example.com").
+    # HTTP defines latin-1 for header bytes, and decoding it can never fail.
+    head = raw_head.decode('latin-1')
+
+    # Every CR and LF must be part of a CRLF line ending; a bare one makes the head malformed.
+    if not head.count('\r') == head.count('\n') == head.count('\r\n'):
+        return {}
+
+    # Subsequent lines are headers (e.g., "Host: example.com"). They are scanned in place
+    # with str.find, so no list of lines or of name/value pairs is built along the way.
     headers = {}
-    for line in lines[1:]:
-        key, value = line.split(': ', 1)
-        headers[key] = value
+    start = match.end()
+    head_length = len(head)
+    while start < head_length:
+        end = head.find('\r\n', start)
+        colon = head.find(':', start, end)
+        if colon <= start or end < 0:
+            return {}  # Malformed header line: no colon, an empty name, or no CRLF
+        headers[head[start:colon]] = head[colon + 1:end].strip(' \t')
+        start = end + 2
 
     return {
-        "method": method,
+        "method": method.decode('ascii'),
         "path": path,
-        "version": version,
+        "version": version.decode('ascii'),
         "headers": headers,
-        "body": body
     }
 
 
-def get_content_type(file_path: str) -> (str, bool):
+def thread_recv_buffer() -> memoryview:
+    """
+    Returns the calling thread's receive buffer, allocated on first use.
+    It is per worker rather than per connection, so parked connections hold no buffer.
+    """
+    recv_view = getattr(_thread_local, 'recv_view', None)
+    if recv_view is None:
+        recv_view = _thread_local.recv_view = memoryview(bytearray(RECV_BUFFER_SIZE))
+    return recv_view
+
+
+def read_request(connection: Connection) -> dict:
+    """
+    Reads one complete request from the connection: the head, then as many body bytes as
+    `Content-Length` announces. Returns the parsed request, {} if it is malformed, or None
+    if the client closed the connection. Bytes past the end of the request stay buffered.
+    """
+    client_socket = connection.socket
+    buffer = connection.buffer
+    # Data is received into the worker's reusable buffer rather than a new bytes object per recv.
+    recv_view = thread_recv_buffer()
+
+    # Receiving until the blank line that ends the head has arrived.
+    search_start = 0
+    request_line_checked = False
+    # The whole head must arrive within HEAD_READ_TIMEOUT. A per-recv timeout alone would let
+    # a client trickle in a byte at a time (slowloris) and hold the worker indefinitely.
+    deadline = None
+    while True:
+        head_end = buffer.find(b'\r\n\r\n', search_start)
+        if head_end != -1:
+            break
+        # Rejecting a malformed request line as soon as it is complete, without
+        # waiting for (or buffering) the rest of the head.
+        if not request_line_checked and b'\r\n' in buffer:
+            if not REQUEST_LINE_RE.match(buffer):
+                return {}
+            request_line_checked = True
+        if len(buffer) > MAX_HEADER_SIZE:
+            raise RequestError(431, "Request Header Fields Too Large")
+        # Only the new bytes (plus 3 for a terminator split across chunks) need searching.
+        search_start = max(0, len(buffer) - 3)
+        if deadline is None:
+            deadline = time.monotonic() + HEAD_READ_TIMEOUT
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("request head not received in time")
+        client_socket.settimeout(remaining)
+        received = client_socket.recv_into(recv_view)
+        if not received:
+            return None  # Client closed the connection.
+        buffer += recv_view[:received]
+
+    if deadline is not None:
+        # Restoring the regular timeout for the body and the response.
+        client_socket.settimeout(KEEP_ALIVE_TIMEOUT)
+    if head_end > MAX_HEADER_SIZE:
+        raise RequestError(431, "Request Header Fields Too Large")
+    # The head is passed on with the CRLF that ends its last header line.
+    request = parse_http_request(bytes(buffer[:head_end + 2]))
+    if not request:
+        return {}
+
+    try:
+        content_length = int(request['headers'].get('Content-Length', 0))
+    except ValueError:
+        return {}
+    if content_length < 0:
+        return {}
+    if content_length > MAX_BODY_SIZE:
+        raise RequestError(413, "Payload Too Large")
+
+    # Receiving the rest of the body, if it didn't arrive together with the head.
+    body_start = head_end + 4
+    body_end = body_start + content_length
+    while len(buffer) < body_end:
+        received = client_socket.recv_into(recv_view)
+        if not received:
+            return None
+        buffer += recv_view[:received]
+
+    # The body stays as bytes; handlers decode it only if and how they need to.
+    request['body'] = bytes(buffer[body_start:body_end])
+    del buffer[:body_end]
+    return request
+
+
+def get_content_type(file_path: str) -> (bytes, bool):
     """
     Determines the MIME type for a file and whether it should be downloaded as an attachment.
+    Unsupported file types give (None, False).
     """
     ext = os.path.splitext(file_path)[1].lower()
-    if ext == '.html':
-        return 'text/html; charset=utf-8', False
-    elif ext in ['.txt', '.png', '.jpg', '.jpeg']:
-        # Treat as a generic binary stream to trigger download.
-        return 'application/octet-stream', True
-    else:
-        # Unsupported file type.
-        return None, False
+    return CONTENT_TYPES.get(ext, (None, False))
 
 
-def build_http_response(status_code: int, status_message: str, headers: dict, body: bytes = b'', keep_alive: bool = False):
+def format_date_header() -> bytes:
     """
-    Constructs a complete, well-formed HTTP response as a byte string.
+    Formats the `Date` header line for the current time.
     """
-    response_line = f"HTTP/1.1 {status_code} {status_message}\r\n"
-    
-    # adding standard headers required for every response.
-    headers['Date'] = formatdate(timeval=None, localtime=False, usegmt=True)
-    headers['Server'] = 'MyPythonHTTPServer'
-    headers['Content-Length'] = str(len(body))
-    
-    # adding Keep-Alive headers based on the connection decision.
-    if keep_alive:
-        headers['Connection'] = 'keep-alive'
-        headers['Keep-Alive'] = 'timeout=30, max=100'
-    else:
-        headers['Connection'] = 'close'
-    
-    header_lines = "".join([f"{k}: {v}\r\n" for k, v in headers.items()])
-    
-    # combining all parts and encode to bytes for sending over the socket.
-    return response_line.encode('utf-8') + header_lines.encode('utf-8') + b"\r\n" + body
+    return f"Date: {formatdate(timeval=None, localtime=False, usegmt=True)}\r\n".encode('ascii')
+
+
+# The current Date header line. The header only has one-second resolution, so instead of
+# formatting it per response, a background thread refreshes it once per second.
+date_header = format_date_header()
+
 
+def refresh_date_header():
+    """The main loop of the date thread: reformats the Date header at the start of every second."""
+    global date_header
+    while True:
+        time.sleep(1 - time.time() % 1)
+        date_header = format_date_header()
 
-def send_error_response(client_socket: socket.socket, status_code: int, status_message: str, headers: dict = None):
+
+def build_http_response(status_code: int, status_message: str, headers: bytes = b'', body: bytes = b'', keep_alive: bool = False,
+                        content_length: int = None):
+    """
+    Constructs a well-formed HTTP response as a (header_bytes, body) pair.
+    `headers` holds the response-specific header lines, already encoded and CRLF-terminated.
+    The body is kept separate so it never has to be copied into the header buffer.
+    `content_length` overrides the body length when the body is sent separately (e.g. via sendfile).
+    """
+    status_line = STATUS_LINES.get(status_code)
+    if status_line is None:
+        status_line = b"HTTP/1.1 %d %s\r\n" % (status_code, status_message.encode('utf-8'))
+    if content_length is None:
+        content_length = len(body)
+
+    # Filling a single bytes template (PEP 461 formatting, done in C) avoids building
+    # intermediate strings for each part of the head.
+    head = b"%s%s%sContent-Length: %d\r\n%s%s\r\n" % (
+        status_line,
+        date_header,
+        SERVER_HEADER,
+        content_length,
+        # adding Keep-Alive headers based on the connection decision.
+        KEEP_ALIVE_HEADERS if keep_alive else CLOSE_HEADERS,
+        headers,
+    )
+    # the body is passed along untouched.
+    return head, body
+
+
+def send_response(client_socket: socket.socket, response: tuple):
+    """
+    Sends a (header_bytes, body) response with scatter/gather I/O so the kernel
+    writes both buffers in one syscall, without concatenating them in userspace.
+    """
+    if not hasattr(client_socket, 'sendmsg'):
+        # Platforms without sendmsg (e.g. Windows) fall back to one sendall per buffer.
+        for buffer in response:
+            client_socket.sendall(buffer)
+        return
+
+    buffers = [memoryview(buffer) for buffer in response if buffer]
+    while buffers:
+        sent = client_socket.sendmsg(buffers)
+        # sendmsg may write only part of the data; drop what was sent and retry.
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if buffers and sent:
+            buffers[0] = buffers[0][sent:]
+
+
+def set_cork(client_socket: socket.socket, enabled: bool):
+    """
+    Turns corking (TCP_CORK on Linux, TCP_NOPUSH on BSD/macOS) on or off.
+    On other platforms it does nothing.
+    """
+    if CORK_OPTION is not None:
+        client_socket.setsockopt(socket.IPPROTO_TCP, CORK_OPTION, 1 if enabled else 0)
+
+
+def send_error_response(client_socket: socket.socket, status_code: int, status_message: str, headers: bytes = b''):
     """
     Builds and sends a standard HTTP error response.
-    Error responses always close the connection.
+    Error responses always close the connection, so a client that has already
+    reset or closed it is not an error here.
     """
-    if headers is None:
-        headers = {}
     response = build_http_response(status_code, status_message, headers, keep_alive=False)
-    client_socket.sendall(response)
+    try:
+        send_response(client_socket, response)
+    except OSError:
+        pass
+
+
+def make_etag(st: os.stat_result) -> str:
+    """
+    Builds a strong ETag from a file's modification time and size.
+    """
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Checks an If-None-Match header value (a list of ETags, or '*') against the current ETag.
+    """
+    if if_none_match.strip() == '*':
+        return True
+    # If-None-Match uses weak comparison, so a 'W/' prefix is ignored.
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def build_validator_headers(st: os.stat_result, etag: str) -> bytes:
+    """
+    Builds the encoded cache validator header lines (ETag and Last-Modified) for a file.
+    """
+    last_modified = formatdate(timeval=st.st_mtime, localtime=False, usegmt=True)
+    return b"ETag: %s\r\nLast-Modified: %s\r\n" % (etag.encode('ascii'), last_modified.encode('ascii'))
+
+
+def is_not_modified(request: dict, st: os.stat_result, etag: str) -> bool:
+    """
+    Evaluates a conditional GET: True if the client's cached copy is still current.
+    """
+    # If-None-Match takes precedence; If-Modified-Since is only used without it.
+    if_none_match = request['headers'].get('If-None-Match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request['headers'].get('If-Modified-Since')
+    if if_modified_since:
+        # An invalid date, or one in the future, is ignored (RFC 9110, section 13.1.3).
+        parsed = parsedate_tz(if_modified_since)
+        if parsed is None:
+            return False
+        try:
+            if_modified_since_time = mktime_tz(parsed)
+        except (ValueError, OverflowError):
+            return False
+        if if_modified_since_time > time.time():
+            return False
+        # HTTP dates have one-second resolution, so the mtime is truncated to match.
+        return int(st.st_mtime) <= if_modified_since_time
+    return False
+
+
+def accepted_encodings(accept_encoding: str) -> tuple:
+    """
+    Parses an Accept-Encoding header value into two sets of content-codings: the ones the
+    client accepts, and the ones it refuses by giving them a weight of zero ('q=0').
+    A '*' in the accepted set stands for any coding the header doesn't name.
+    """
+    accepted = set()
+    refused = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    refused.add(coding)
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted, refused
 
 
-def handle_get_request(client_socket: socket.socket, request: dict, keep_alive: bool):
+def find_sidecars(file_path: str) -> tuple:
+    """
+    Looks up the precompressed sidecars of `file_path` that exist on disk.
+    Returns their (content-coding, path) pairs in order of preference.
+    """
+    if os.path.splitext(file_path)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return ()
+    sidecars = []
+    for coding, suffix in PRECOMPRESSED_ENCODINGS:
+        try:
+            st = os.stat(file_path + suffix)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            sidecars.append((coding, file_path + suffix))
+    return tuple(sidecars)
+
+
+def build_file_headers(file_path: str, content_type: bytes, is_attachment: bool, validators: bytes) -> bytes:
+    """
+    Builds the encoded file-specific header lines (Content-Type, ETag, Last-Modified and,
+    for downloads, Content-Disposition).
+    """
+    headers = b"Content-Type: %s\r\n%s" % (content_type, validators)
+    if is_attachment:
+        filename = os.path.basename(file_path)
+        # This header tells the browser to download the file.
+        headers += f'Content-Disposition: attachment; filename="{filename}"\r\n'.encode('utf-8')
+    return headers
+
+
+def handle_get_request(client_socket: socket.socket, request: dict, keep_alive: bool, is_head: bool = False) -> tuple:
+    """
+    Serves a static file. Like every handler, returns a (keep_alive, status_code, body_length) tuple.
+    With `is_head`, it answers a HEAD request: the same headers as for GET, but no body.
+    """
     thread_name = threading.current_thread().name
     path = request['path']
     if path == '/':
         path = '/index.html'
 
-    # resolving the absolute path and ensure it's within the allowed resources directory.
-    file_path = os.path.abspath(os.path.join(RESOURCES_DIR, path.lstrip('/')))
-    if not file_path.startswith(RESOURCES_DIR):
-        logging.warning(f"[{thread_name}] SECURITY VIOLATION: Path Traversal for: {path}")
-        send_error_response(client_socket, 403, "Forbidden")
-        return False # Signal to close connection
+    # Paths that resolved to a servable file before skip the resolution and checks below.
+    resolved = resolved_paths.get(path)
+    if resolved is None:
+        # normalizing the path (RESOURCES_DIR is already absolute, so no getcwd() is needed)
+        # and ensuring it's within the allowed resources directory.
+        file_path = os.path.normpath(os.path.join(RESOURCES_DIR, path.lstrip('/')))
+        # The directory itself (e.g. '/.') is allowed here and answered with 404 below.
+        if file_path != RESOURCES_DIR and not file_path.startswith(RESOURCES_DIR_PREFIX):
+            logging.warning(f"[{thread_name}] SECURITY VIOLATION: Path Traversal for: {path}")
+            send_error_response(client_socket, 403, "Forbidden")
+            return False, 403, 0 # Signal to close connection
+    else:
+        file_path = resolved[0]
 
-    if not os.path.exists(file_path) or not os.path.isfile(file_path):
+    # A single stat checks that the file exists and is a regular file, revalidates a
+    # cached resolution, and provides the file's metadata.
+    try:
+        st = os.stat(file_path)
+    except (OSError, ValueError):
+        # ValueError: the path contains a NUL byte, so no such file can exist.
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        # Also forgetting the resolution, in case the file was removed since it was made.
+        resolved_paths.pop(path, None)
         send_error_response(client_socket, 404, "Not Found")
-        return False
+        return False, 404, 0
 
-    content_type, is_attachment = get_content_type(file_path)
-    if content_type is None:
-        send_error_response(client_socket, 415, "Unsupported Media Type")
-        return False
+    # Resolving the file's type and looking up its sidecars, at most once per version of the file.
+    if resolved is None or resolved[3] != st.st_mtime_ns:
+        if resolved is None:
+            content_type, is_attachment = get_content_type(file_path)
+            if content_type is None:
+                send_error_response(client_socket, 415, "Unsupported Media Type")
+                return False, 415, 0
+            # Non-canonical spellings are served, but resolved again on every request.
+            canonical_path = '/' + file_path[len(RESOURCES_DIR_PREFIX):].replace(os.sep, '/')
+            cacheable = path == canonical_path and len(resolved_paths) < RESOLVED_PATHS_MAX_ENTRIES
+        else:
+            content_type, is_attachment = resolved[1], resolved[2]
+            cacheable = True
 
-    # Read file in binary mode ('rb') to handle all file types correctly.
-    with open(file_path, 'rb') as f:
-        file_content = f.read()
+        resolved = (file_path, content_type, is_attachment, st.st_mtime_ns, find_sidecars(file_path))
+        if cacheable:
+            resolved_paths[path] = resolved
 
-    headers = {'Content-Type': content_type}
-    if is_attachment:
-        filename = os.path.basename(file_path)
-        # This header tells the browser to download the file.
-        headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    file_path, content_type, is_attachment, _, sidecars = resolved
 
-    response = build_http_response(200, "OK", headers, file_content, keep_alive)
-    client_socket.sendall(response)
-    logging.info(f"[{thread_name}] Response: 200 OK ({len(file_content)} bytes)")
-    return keep_alive
+    # If the client accepts a compressed encoding that has a sidecar file on disk, that file
+    # is sent instead, so nothing is compressed per request. From here on, `body_path` and
+    # `st` describe the file actually sent, which gives each encoding its own ETag.
+    # Every response for a file with sidecars varies by Accept-Encoding, even uncompressed ones.
+    body_path = file_path
+    encoding_headers = b''
+    vary_header = b''
+    if sidecars:
+        vary_header = VARY_ACCEPT_ENCODING_HEADER
+        accept_encoding = request['headers'].get('Accept-Encoding')
+        if accept_encoding:
+            accepted, refused = accepted_encodings(accept_encoding)
+            for coding, sidecar_path in sidecars:
+                if coding not in accepted and ('*' not in accepted or coding in refused):
+                    continue
+                try:
+                    sidecar_st = os.stat(sidecar_path)
+                except OSError:
+                    # The sidecar was removed; forgetting the resolution redoes the lookup.
+                    resolved_paths.pop(path, None)
+                    continue
+                body_path, st = sidecar_path, sidecar_st
+                encoding_headers = b"Content-Encoding: %s\r\n" % coding.encode('ascii')
+                break
+        encoding_headers += vary_header
 
+    etag = make_etag(st)
 
-def handle_post_request(client_socket: socket.socket, request: dict, keep_alive: bool):
-    thread_name = threading.current_thread().name
-    
+    # Conditional GET: if the client's copy is current, skip the body entirely.
+    if is_not_modified(request, st, etag):
+        response = build_http_response(304, "Not Modified", build_validator_headers(st, etag) + vary_header,
+                                       keep_alive=keep_alive, content_length=st.st_size)
+        send_response(client_socket, response)
+        return keep_alive, 304, 0
+
+    if is_head:
+        # Everything a HEAD response needs comes from the stat, so the file is never opened.
+        headers = build_file_headers(file_path, content_type, is_attachment,
+                                     build_validator_headers(st, etag)) + encoding_headers
+        response = build_http_response(200, "OK", headers, keep_alive=keep_alive, content_length=st.st_size)
+        send_response(client_socket, response)
+        return keep_alive, 200, 0
+
+    if st.st_size <= CACHE_MAX_FILE_SIZE:
+        # Small files are served from memory; only a miss touches the disk.
+        cached = file_cache.get(body_path, st)
+        if cached is None:
+            header_block = build_file_headers(file_path, content_type, is_attachment,
+                                              build_validator_headers(st, etag)) + encoding_headers
+            with open(body_path, 'rb') as f:
+                file_content = f.read()
+            file_cache.put(body_path, st, header_block, file_content)
+        else:
+            header_block, file_content = cached
+
+        response = build_http_response(200, "OK", header_block, file_content, keep_alive)
+        send_response(client_socket, response)
+        return keep_alive, 200, len(file_content)
+
+    headers = build_file_headers(file_path, content_type, is_attachment,
+                                 build_validator_headers(st, etag)) + encoding_headers
+
+    # Open file in binary mode ('rb') to handle all file types correctly.
+    with open(body_path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        header_bytes, _ = build_http_response(200, "OK", headers, keep_alive=keep_alive, content_length=file_size)
+        # Corking (Linux) holds back partial packets, so the head and the start of the
+        # file go out together in full-sized segments instead of a small head-only one.
+        set_cork(client_socket, True)
+        try:
+            client_socket.sendall(header_bytes)
+            # From here on the status line is out, so a failure can no longer be turned into
+            # an error response; closing the connection is the only way left to signal it.
+            try:
+                if HAS_SENDFILE:
+                    # `sendfile` lets the kernel copy the file straight to the socket (zero-copy),
+                    # so the file is never read into Python memory. It is capped at the advertised
+                    # Content-Length in case the file grows while it is being sent.
+                    sent = client_socket.sendfile(f, 0, file_size)
+                else:
+                    # Without sendfile, the file is mapped instead of read in chunks: the socket
+                    # sends straight from the page cache, which every worker serving the same
+                    # file shares, so no copy of the file is made in Python memory.
+                    with mmap.mmap(f.fileno(), file_size, access=mmap.ACCESS_READ) as mapped:
+                        client_socket.sendall(mapped)
+                    sent = file_size
+            except (ConnectionError, socket.timeout):
+                raise
+            except Exception as e:
+                logging.error(f"[{thread_name}] Error while sending {body_path}: {e}")
+                return False, 200, 0
+        finally:
+            # Uncorking flushes whatever is still held back.
+            set_cork(client_socket, False)
+
+    if sent < file_size:
+        # The file shrank mid-transfer, so the response is shorter than announced.
+        # Closing the connection is the only way to signal that to the client.
+        return False, 200, sent
+
+    return keep_alive, 200, file_size
+
+
+def write_file(file_path: str, data: bytes):
+    """
+    Writes `data` to a new file using unbuffered OS-level writes.
+    `O_EXCL` makes it fail rather than overwrite a file that already exists.
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    try:
+        view = memoryview(data)
+        # os.write may write less than requested, so loop until everything is written.
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def handle_post_request(client_socket: socket.socket, request: dict, keep_alive: bool) -> tuple:
+    """
+    Saves a posted JSON document under resources/uploads.
+    """
     # Rule: Only accept application/json.
     if request['headers'].get('Content-Type') != 'application/json':
         send_error_response(client_socket, 415, "Unsupported Media Type")
-        return False
+        return False, 415, 0
 
-    # Rule: Ensure the body is valid JSON.
+    # Rule: Ensure the body is valid JSON. json.loads decodes the UTF-8 bytes itself;
+    # invalid UTF-8 raises UnicodeDecodeError, which is a ValueError like JSONDecodeError.
+    # The parsed document is only needed for validation, so it isn't kept.
     try:
-        json_data = json.loads(request['body'])
-    except json.JSONDecodeError:
+        json.loads(request['body'])
+    except ValueError:
         send_error_response(client_socket, 400, "Bad Request")
-        return False
+        return False, 400, 0
 
-    # Create a unique filename based on timestamp and a random ID.
-    timestamp = time.strftime('%Y%m%d_%H%M%S')
-    random_id = random.randint(1000, 9999)
-    filename = f"upload_{timestamp}_{random_id}.json"
+    # Create a unique filename from the process ID, the server's start time, and a
+    # per-process counter; no per-request time formatting or random draws needed.
+    filename = f"upload_{os.getpid()}_{SERVER_START_TIME}_{next(upload_counter)}.json"
     filepath = os.path.join(RESOURCES_DIR, 'uploads', filename)
 
-    # writing the received JSON data to the file.
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=4)
+    # The validated body is saved exactly as received, with a single write syscall,
+    # rather than being serialized again from the parsed document.
+    write_file(filepath, request['body'])
 
     # Respond with a 201 Created status, indicating success.
     response_body = {
@@ -229,74 +953,144 @@ def handle_post_request(client_socket: socket.socket, request: dict, keep_alive:
         "filepath": f"/uploads/{filename}"
     }
     response_body_bytes = json.dumps(response_body).encode('utf-8')
-    headers = {'Content-Type': 'application/json'}
-    response = build_http_response(201, "Created", headers, response_body_bytes, keep_alive)
-    client_socket.sendall(response)
-    logging.info(f"[{thread_name}] Response: 201 Created, saved to {filename}")
-    return keep_alive
+    response = build_http_response(201, "Created", JSON_CONTENT_TYPE_HEADER, response_body_bytes, keep_alive)
+    send_response(client_socket, response)
+    return keep_alive, 201, len(response_body_bytes)
 
 
-def handle_connection(client_socket: socket.socket, server_config: tuple):
+def handle_connection(connection: Connection) -> bool:
+    """
+    Serves the next request on a connection, plus any pipelined requests already received.
+    Returns True if the connection should stay open and be parked until the client's next request.
+    """
     thread_name = threading.current_thread().name
-    requests_handled = 0
-    
+    client_socket = connection.socket
+    keep_open = False
+
     try:
-        # setting a 30-second idle timeout for the connection.
-        client_socket.settimeout(30)
-        
-        # Loop to handle multiple requests on one connection (Keep-Alive).
-        while requests_handled < 100:
-            try:
-                raw_request_bytes = client_socket.recv(8192)
-                if not raw_request_bytes:
-                    break  # Client closed the connection.
-                
-                request = parse_http_request(raw_request_bytes.decode('utf-8'))
+        if connection.requests_handled == 0:
+            # setting a 30-second timeout for reads within a request.
+            client_socket.settimeout(KEEP_ALIVE_TIMEOUT)
+
+        try:
+            # Loop to handle pipelined requests that are already buffered on this connection.
+            while True:
+                keep_open = False
+                request = read_request(connection)
+                if request is None:
+                    return False  # Client closed the connection.
                 if not request:
-                    send_error_response(client_socket, 400, "Bad Request"); break
+                    send_error_response(client_socket, 400, "Bad Request"); return False
 
                 connection_header = request['headers'].get('Connection', '').lower()
                 http_version = request.get('version', 'HTTP/1.0')
                 keep_alive = (http_version == 'HTTP/1.1' and connection_header != 'close') or \
                              (http_version == 'HTTP/1.0' and connection_header == 'keep-alive')
-                
+
                 # Host Header Security Validation 
-                host_header = request['headers'].get('Host'); server_host, server_port = server_config
+                host_header = request['headers'].get('Host'); server_host, server_port = connection.server_config
                 expected_host = f"{server_host}:{server_port}"
                 if not host_header:
                     logging.warning(f"[{thread_name}] SECURITY VIOLATION: Missing Host header.")
-                    send_error_response(client_socket, 400, "Bad Request"); break
+                    send_error_response(client_socket, 400, "Bad Request"); return False
                 if host_header != expected_host:
                     logging.warning(f"[{thread_name}] SECURITY VIOLATION: Mismatched Host. Got '{host_header}'.")
-                    send_error_response(client_socket, 403, "Forbidden"); break
+                    send_error_response(client_socket, 403, "Forbidden"); return False
 
-                # PDF-Compliant Logging 
-                log_line = f"{request['method']} {request['path']} {request.get('version', '')}"
-                logging.info(f"[{thread_name}] Request #{requests_handled+1}: {log_line}")
-                logging.info(f"[{thread_name}] Host validation: {host_header}")
-                
                 # Routing  ---
                 if request['method'] == 'GET':
-                    keep_alive = handle_get_request(client_socket, request, keep_alive)
+                    keep_alive, status_code, body_length = handle_get_request(client_socket, request, keep_alive)
+                elif request['method'] == 'HEAD':
+                    keep_alive, status_code, body_length = handle_get_request(client_socket, request, keep_alive,
+                                                                              is_head=True)
                 elif request['method'] == 'POST':
-                    keep_alive = handle_post_request(client_socket, request, keep_alive)
+                    keep_alive, status_code, body_length = handle_post_request(client_socket, request, keep_alive)
                 else:
-                    send_error_response(client_socket, 405, "Method Not Allowed"); keep_alive = False
+                    send_error_response(client_socket, 405, "Method Not Allowed", ALLOW_HEADER)
+                    keep_alive, status_code, body_length = False, 405, 0
 
-                requests_handled += 1
-                logging.info(f"[{thread_name}] Connection: {'keep-alive' if keep_alive else 'close'}")
-                if not keep_alive:
-                    break # Exit loop if client requested to close or an error occurred.
+                connection.requests_handled += 1
+                # One access-log line per request. The level check skips building the
+                # arguments entirely when INFO logging is disabled.
+                if logging.root.isEnabledFor(logging.INFO):
+                    logging.info("[%s] Request #%d: %s %s %s -> %d (%d bytes), connection: %s",
+                                 thread_name, connection.requests_handled, request['method'], request['path'],
+                                 request['version'], status_code, body_length, 'keep-alive' if keep_alive else 'close')
+                # Close if the client requested it, an error occurred, or the request limit is reached.
+                keep_open = keep_alive and connection.requests_handled < MAX_REQUESTS_PER_CONNECTION
+                if not keep_open:
+                    return False
+                # A client may pipeline requests, sending the next ones without waiting for responses.
+                # If the next request's head has already arrived, it is served right away;
+                # otherwise the connection is parked until the client sends more.
+                if b'\r\n\r\n' not in connection.buffer:
+                    return True
 
-            except socket.timeout:
-                logging.info(f"[{thread_name}] Connection timed out.")
-                break
-            except Exception as e:
-                logging.error(f"[{thread_name}] Error during request loop: {e}")
-                send_error_response(client_socket, 500, "Internal Server Error")
-                break
+        except socket.timeout:
+            logging.info(f"[{thread_name}] Connection timed out.")
+            return False
+        except ConnectionError:
+            # The client reset or closed the connection (e.g. a cancelled download),
+            # so there is no one left to send an error response to.
+            logging.info(f"[{thread_name}] Client disconnected.")
+            return False
+        except RequestError as e:
+            logging.warning(f"[{thread_name}] Rejected request: {e}")
+            send_error_response(client_socket, e.status_code, e.status_message)
+            return False
+        except Exception as e:
+            logging.error(f"[{thread_name}] Error during request loop: {e}")
+            send_error_response(client_socket, 500, "Internal Server Error")
+            return False
     finally:
-        client_socket.close()
+        if not keep_open:
+            client_socket.close()
+
+
+def create_listening_socket(server_config: tuple, reuse_port: bool) -> socket.socket:
+    """
+    Creates a socket bound to `server_config` and listening for connections.
+    With `reuse_port`, several sockets can bind the same address and the kernel
+    spreads incoming connections across them.
+    """
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    # Accepted sockets inherit these options from the listening socket, which saves three
+    # setsockopt calls per connection. Setting the receive buffer before listen() also lets
+    # the kernel pick a matching TCP window scale during the handshake.
+    # Disabling Nagle's algorithm so small responses are flushed immediately
+    # instead of waiting on the client's delayed ACK.
+    server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # Enlarging the socket buffers so a single connection can keep more data
+    # in flight on large transfers.
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    server_socket.bind(server_config)
+    # A deep backlog lets the kernel absorb connection bursts while the accept loop catches up.
+    server_socket.listen(LISTEN_BACKLOG)
+    return server_socket
+
+
+def accept_connections(server_socket: socket.socket, thread_pool: ThreadPool, server_config: tuple):
+    """
+    The accept loop of a listener: hands every new connection over to be served.
+    """
+    thread_name = threading.current_thread().name
+    while True:
+        # This is the listener's only blocking call. It waits for new connections.
+        # On Linux, Python already uses accept4() with SOCK_CLOEXEC here, so no extra
+        # fcntl call is made; the socket is switched to non-blocking when first served.
+        client_socket, client_address = server_socket.accept()
+        # Accepts are logged at DEBUG level only; requests get their own access-log line.
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug("[%s] Accepted connection from %s:%d", thread_name, client_address[0], client_address[1])
+
+        # New connections wait in the idle monitor until their first request arrives, so a
+        # client that connects but sends nothing never ties up a worker. The monitor hands
+        # it to the thread pool, or rejects it with 503 if the pool is saturated.
+        thread_pool.idle_connections.park(Connection(client_socket, server_config))
 
 
 def main():
@@ -305,43 +1099,83 @@ def main():
     parser.add_argument("port", type=int, default=8080, nargs='?', help="The port the server will listen on")
     parser.add_argument("host", type=str, default="127.0.0.1", nargs='?', help="The host address to bind to")
     parser.add_argument("max_threads", type=int, default=10, nargs='?', help="Maximum number of threads in the pool")
+    parser.add_argument("listeners", type=int, default=1, nargs='?',
+                        help="Number of accept threads, each with its own SO_REUSEPORT socket")
+    parser.add_argument("processes", type=int, default=1, nargs='?',
+                        help="Number of server processes sharing the listening sockets (0 = one per CPU core)")
     args = parser.parse_args()
+    server_config = (args.host, args.port)
+
+    listener_count = max(1, args.listeners)
+    if listener_count > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        logging.warning("SO_REUSEPORT is not supported on this platform. Using a single listener.")
+        listener_count = 1
+
+    process_count = args.processes if args.processes > 0 else os.cpu_count() or 1
+    if process_count > 1 and not hasattr(os, 'fork'):
+        logging.warning("os.fork is not supported on this platform. Using a single process.")
+        process_count = 1
+
+    # Setting up the listening sockets. With several listeners, each one has its own socket
+    # on the same port, so the kernel balances accepts instead of serializing them on one socket.
+    listeners = [create_listening_socket(server_config, reuse_port=listener_count > 1)
+                 for _ in range(listener_count)]
+
+    # With several processes, each one gets its own interpreter (and GIL), so parsing and
+    # response building run in parallel across cores. The children inherit the listening
+    # sockets and the kernel hands each accepted connection to one of the processes.
+    # Forking happens before any thread is started, since threads do not survive a fork.
+    children = []
+    for _ in range(process_count - 1):
+        pid = os.fork()
+        if pid == 0:
+            children = None  # This is a child process.
+            break
+        children.append(pid)
+
+    if process_count > 1:
+        # Telling the processes' log lines apart.
+        log_handler.setFormatter(logging.Formatter(fmt='[%(asctime)s] [PID %(process)d] %(message)s',
+                                                   datefmt='%Y-%m-%d %H:%M:%S'))
+    log_listener.start()
 
     # Initialising the thread pool with a max queue size for overload protection.
     max_queue_size = args.max_threads * 2
     thread_pool = ThreadPool(max_threads=args.max_threads, queue_size=max_queue_size)
-    server_config = (args.host, args.port)
+    threading.Thread(target=refresh_date_header, name="DateUpdater", daemon=True).start()
 
-    # Setting up the main listening socket.
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind(server_config)
-        server_socket.listen(50)
-        
+    if children is not None:
         logging.info(f"HTTP Server started on http://{server_config[0]}:{server_config[1]}")
+        logging.info(f"Processes: {process_count}")
         logging.info(f"Thread pool size: {args.max_threads}")
+        logging.info(f"Listeners: {listener_count}")
         logging.info(f"Serving files from '{RESOURCES_DIR}' directory")
         logging.info("Press Ctrl+C to stop the server")
 
-        while True:
+    for i, server_socket in enumerate(listeners[1:], start=2):
+        thread = threading.Thread(target=accept_connections, args=(server_socket, thread_pool, server_config),
+                                  name=f"Listener-{i}", daemon=True)
+        thread.start()
+
+    try:
+        # The main thread runs the first listener itself.
+        accept_connections(listeners[0], thread_pool, server_config)
+    except KeyboardInterrupt:
+        if children is not None:
+            logging.info("\nServer is shutting down.")
+    finally:
+        for server_socket in listeners:
+            server_socket.close()
+        # Ctrl+C reaches every process in the terminal's process group, but the parent also
+        # stops its children explicitly (in case only it was signalled) and reaps them.
+        for pid in children or ():
             try:
-                # This is the main thread's only blocking call. It waits for new connections.
-                client_socket, client_address = server_socket.accept()
-                logging.info(f"[MainThread] Accepted connection from {client_address[0]}:{client_address[1]}")
-                
-                try:
-                    # Add the new connection to the thread pool's task queue.
-                    task = (client_socket, server_config)
-                    thread_pool.add_task(task)
-                except queue.Full:
-                    # Handle server overload by rejecting the connection.
-                    logging.warning(f"[MainThread] Thread pool queue is full. Rejecting connection.")
-                    send_error_response(client_socket, 503, "Service Unavailable", headers={'Retry-After': '10'})
-                    client_socket.close()
-
-            except KeyboardInterrupt:
-                logging.info("\nServer is shutting down.")
-                break
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            os.waitpid(pid, 0)
+        # Flushing any queued log records before exiting.
+        log_listener.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()